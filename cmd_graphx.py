@@ -3,10 +3,13 @@
 from __future__ import print_function
 
 from _functools import partial
+from collections import deque
 from _version import (__version__, __updated__)  # @UnusedImport
 from doit import cmd_base
 from doit.cmd_base import DoitCmdBase
 from doit.exceptions import InvalidCommand
+import fnmatch
+import json
 import os
 import pprint
 import re
@@ -162,30 +165,154 @@ def _construct_graph(all_tasks_map, filter_task_names, no_children, filter_deps)
     graph = nx.DiGraph()
 
     def add_graph_node(node, node_type):
+        """:return: true if `node` is a newly-added task, to be expanded"""
         if node in graph:
-            return
-        if node_type != 'task':
-            graph.add_node(node, type=node_type)
-        else:
-            graph.add_node(node, type=node_type)
-            task = all_tasks_map[node]
-            if not filter_task_names or node in filter_task_names:
-                for dep, dep_kws in six.iteritems(dep_attributes):
-                    for dname in getattr(task, dep):
-                        add_graph_node(
-                            dname, dep_kws['node_type'])
-                        if dep == 'targets':
-                            edge = (dname, node)
-                        else:
-                            edge = (node, dname)
-                        graph.add_edge(*edge, type=dep)
-
-    for tname in (filter_task_names or all_tasks_map.keys()):
-        add_graph_node(tname, 'task')
+            return False
+        graph.add_node(node, type=node_type)
+        return node_type == 'task'
+
+    # Expand tasks with an explicit stack, not to hit the recursion-limit
+    # on long dependency-chains.
+    pending_tasks = [tname
+                     for tname in (filter_task_names or all_tasks_map.keys())
+                     if add_graph_node(tname, 'task')]
+    while pending_tasks:
+        node = pending_tasks.pop()
+        task = all_tasks_map[node]
+        if filter_task_names and node not in filter_task_names:
+            continue
+        for dep, dep_kws in six.iteritems(dep_attributes):
+            for dname in getattr(task, dep):
+                if add_graph_node(dname, dep_kws['node_type']):
+                    pending_tasks.append(dname)
+                if dep == 'targets':
+                    edge = (dname, node)
+                else:
+                    edge = (node, dname)
+                graph.add_edge(*edge, type=dep)
 
     return graph
 
 
+def _index_producers(all_tasks_map):
+    """:return: a dict of ``{target_file: [task_name, ...]}`` for all tasks"""
+    producers = {}
+    for tname, task in six.iteritems(all_tasks_map):
+        for target in task.targets:
+            producers.setdefault(target, []).append(tname)
+    return producers
+
+
+def _expand_wild_deps(all_tasks_map):
+    """
+    Match `wild_dep` patterns against task-names, like doit's `TaskControl`.
+
+    :return: a dict of ``{task_name: [matched_task_name, ...]}``
+    """
+    wild_tasks = {}
+    for tname, task in six.iteritems(all_tasks_map):
+        for pattern in task.wild_dep:
+            wild_tasks.setdefault(tname, []).extend(
+                fnmatch.filter(all_tasks_map, pattern))
+    return wild_tasks
+
+
+def _find_unreachable_tasks(all_tasks_map, producers, wild_tasks,
+                            root_task_names):
+    """
+    Walk task, wildcard & file dependencies of `root_task_names` (breadth-first).
+
+    :return: a sorted list of task-names not reached from any root
+    """
+    task_deps = ('task_dep', 'setup_tasks', 'calc_dep')
+    reached = set(root_task_names)
+    queue = deque(reached)
+    while queue:
+        task = all_tasks_map.get(queue.popleft())
+        if task is None:
+            continue
+        deps = [d for dep in task_deps for d in getattr(task, dep)]
+        deps.extend(wild_tasks.get(task.name, ()))
+        for fname in task.file_dep:
+            deps.extend(producers.get(fname, ()))
+        for dname in deps:
+            if dname not in reached:
+                reached.add(dname)
+                queue.append(dname)
+
+    return sorted(set(all_tasks_map) - reached)
+
+
+def _check_graph(all_tasks_map, root_task_names):
+    """
+    Lint the graph of all tasks & deps in a single pass, proportional to its size.
+
+    Each flagged node gets a ``check`` attribute listing (comma-separated)
+    its problems, and all other nodes an empty one.
+
+    :param seq root_task_names: used only for reachability;
+                                if empty, all tasks are roots
+    :return: a tuple ``(graph, report)``, where `report` is
+             a json-serializable dict with keys:
+             ``cycles``, ``duplicate_targets``, ``orphan_files``,
+             ``unreachable_tasks``
+    """
+    graph = _construct_graph(all_tasks_map, None,
+                             no_children=False, filter_deps=None)
+    wild_tasks = _expand_wild_deps(all_tasks_map)
+    for tname, dnames in six.iteritems(wild_tasks):
+        for dname in dnames:
+            if not graph.has_edge(tname, dname):
+                graph.add_edge(tname, dname, type='wild_dep')
+    node_problems = {}
+
+    def flag(node, problem):
+        node_problems.setdefault(node, []).append(problem)
+
+    # NOTE: networkx's SCC implementation is a non-recursive Tarjan.
+    cycles = []
+    for scc in nx.strongly_connected_components(graph):
+        scc = list(scc)
+        if len(scc) > 1 or scc[0] in graph[scc[0]]:
+            cycles.append(sorted(scc))
+            for node in scc:
+                flag(node, 'cycle')
+    cycles.sort()
+
+    producers = _index_producers(all_tasks_map)
+    duplicate_targets = {fname: sorted(tnames)
+                         for fname, tnames in six.iteritems(producers)
+                         if len(tnames) > 1}
+    for fname in duplicate_targets:
+        if fname in graph:
+            flag(fname, 'duplicate_target')
+
+    orphan_files = []
+    for node, d in graph.nodes(data=True):
+        if (d['type'] == 'file' and node not in producers and
+                not os.path.exists(node)):
+            orphan_files.append(node)
+            flag(node, 'orphan_file')
+    orphan_files.sort()
+
+    unreachable_tasks = []
+    if root_task_names:
+        unreachable_tasks = _find_unreachable_tasks(
+            all_tasks_map, producers, wild_tasks, root_task_names)
+        for tname in unreachable_tasks:
+            flag(tname, 'unreachable')
+
+    for node, d in graph.nodes(data=True):
+        d['check'] = ','.join(node_problems.get(node, ()))
+
+    return graph, {
+        'cycles': cycles,
+        'duplicate_targets': duplicate_targets,
+        'orphan_files': orphan_files,
+        'unreachable_tasks': unreachable_tasks,
+    }
+
+
 opt_subtasks = {
     'name': 'subtasks',
     'short': 'b',
@@ -256,6 +383,18 @@ opt_graph_type = {
             " (one of: %s)." % sorted(SUPPORTED_GRAPH_TYPES)
 }
 
+opt_check = {
+    'name': 'check',
+    'short': '',
+    'long': 'check',
+    'type': bool,
+    'default': False,
+    'help': "lint graph for cycles, duplicate targets, orphan files"
+            " and tasks unreachable from the task-list; print json report"
+            " (graph of all tasks & deps written only if `--out-file` given;"
+            " incompatible with `--deps` & `--no-children`)"
+}
+
 opt_out_file = {
     'name': 'out_file',
     'short': 'O',
@@ -282,6 +421,8 @@ class Graphx(DoitCmdBase):
           doit graph --deps file,calc,target --private
           doit graph --out-file some.png
           doit graph --graph-type json --out-file some.png
+          doit graph --check                     ## json lint-report only
+          doit graph --check --graph gml --out-file some.gml
         
         For networkx's `write_XXX()` methods see:
         http://networkx.github.io/documentation/latest/reference/readwrite.html
@@ -292,7 +433,7 @@ class Graphx(DoitCmdBase):
 
     cmd_options = (opt_subtasks, opt_private, opt_no_children, opt_deps,
                    opt_show_status, opt_template, opt_graph_type,
-                   opt_out_file)
+                   opt_out_file, opt_check)
 
     STATUS_MAP = {'ignore': 'I', 'up-to-date': 'U', 'run': 'R'}
 
@@ -307,12 +448,12 @@ class Graphx(DoitCmdBase):
 
     @staticmethod
     def _include_subtasks(tasks, task_names, include_subtasks):
-        """append any subtasks of 'task_names' """
+        """names of any subtasks of 'task_names' """
         # get task by name
         subtasks = []
         for name in task_names:
             subtasks.extend(
-                cmd_base.subtasks_iter(tasks, tasks[name]))
+                t.name for t in cmd_base.subtasks_iter(tasks, tasks[name]))
         return subtasks
 
     @staticmethod
@@ -344,6 +485,20 @@ class Graphx(DoitCmdBase):
 
             return dep_attributes_out
 
+    @staticmethod
+    def _check_check_options(graph_type, out_file, deps, no_children):
+        """reject options ignored by `--check` """
+        ignored = []
+        if deps:
+            ignored.append('--deps')
+        if no_children:
+            ignored.append('--no-children')
+        if graph_type != opt_graph_type['default'] and '-' == out_file:
+            ignored.append('--graph (without --out-file)')
+        if ignored:
+            msg = "Option(s) ignored by --check: %s" % ', '.join(ignored)
+            raise InvalidCommand(msg)
+
     def _update_task_nodes(self, tasks_map, graph, show_status):
         def task_status(task):
             # FIXME group task status is never up-to-date
@@ -379,21 +534,35 @@ class Graphx(DoitCmdBase):
                  template=opt_template['default'],
                  graph_type=opt_graph_type['default'],
                  out_file=opt_out_file['default'],
+                 check=opt_check['default'],
                  pos_args=None):
         task_names = pos_args
         tasks_map = dict([(t.name, t) for t in self.task_list])
 
         # TODO: Imporve task-selection procedure.
         #
+        root_task_names = task_names
         if task_names:
             Graphx._check_task_names(tasks_map.keys(), task_names)
             if not private:
                 task_names = [t for t in task_names if not t.startswith('_')]
+            root_task_names = task_names
             if subtasks:
                 task_names = Graphx._include_subtasks(
                     tasks_map, task_names, subtasks)
-
-        graph = _construct_graph(tasks_map, task_names, no_children, deps)
+                root_task_names = root_task_names + task_names
+
+        if check:
+            Graphx._check_check_options(graph_type, out_file, deps,
+                                        no_children)
+            # Lint (and write) all tasks & deps, whatever the selection.
+            graph, report = _check_graph(tasks_map, root_task_names)
+            json.dump(report, self.outstream, indent=2, sort_keys=True)
+            self.outstream.write('\n')
+            if '-' == out_file:
+                return
+        else:
+            graph = _construct_graph(tasks_map, task_names, no_children, deps)
         self._update_task_nodes(tasks_map, graph, show_status)
         graph_type, func = _select_graph_func(graph, graph_type)
         out_file = self._prepare_out_file(out_file, graph_type)
@@ -7,6 +7,8 @@ import cmd_graphx
 from doit.exceptions import InvalidCommand
 from doit.task import Task
 from tests.conftest import CmdFactory
+import json
+import sys
 import unittest
 
 from six import StringIO
@@ -159,6 +161,107 @@ class TestConstructGraph(unittest.TestCase):
             #     self.assertIn('is_subtask', d, (node, d))
 
 
+def _broken_tasks():
+    return [
+        Task("a", None, task_dep=['b'], file_dep=['missing.txt']),
+        Task("b", None, file_dep=['b.in'], targets=['a.out', 'c.in']),
+        Task("c", None, file_dep=['c.in'], targets=['b.in', 'a.out']),
+        Task("d", None, task_dep=['d']),
+    ]
+
+
+def _broken_tasks_map():
+    return dict([(t.name, t) for t in _broken_tasks()])
+
+
+def _group_tasks():
+    tasks = [
+        Task("read", None, file_dep=['fin.txt'], targets=['fout.hdf5']),
+        Task("t3", None, task_dep=['t3:a', 't3:b'], has_subtask=True),
+        Task("t3:a", None, file_dep=['fout.hdf5'], targets=['a.json']),
+        Task("t3:b", None, file_dep=['fout.hdf5'], targets=['b.json']),
+        Task("join", None, task_dep=['t3*']),
+    ]
+    # Mark subtasks for both old (`is_subtask`) & new (`subtask_of`) doit.
+    for task in tasks[2:4]:
+        task.is_subtask = True
+        task.subtask_of = 't3'
+    return tasks
+
+
+def _group_tasks_map():
+    return dict([(t.name, t) for t in _group_tasks()])
+
+
+class TestCheckGraph(unittest.TestCase):
+
+    def _check(self, tasks_map, root_task_names=None):
+        return cmd_graphx._check_graph(tasks_map, root_task_names)
+
+    def test_clean(self):
+        graph, report = self._check(_group_tasks_map())
+        self.assertEqual(report['cycles'], [])
+        self.assertEqual(report['duplicate_targets'], {})
+        self.assertEqual(report['unreachable_tasks'], [])
+        self.assertEqual(report['orphan_files'], ['fin.txt'])
+        for node, d in graph.nodes(data=True):
+            expected = 'orphan_file' if node == 'fin.txt' else ''
+            self.assertEqual(d['check'], expected, (node, d))
+
+    def test_cycles(self):
+        graph, report = self._check(_broken_tasks_map())
+        self.assertEqual(report['cycles'],
+                         [['b', 'b.in', 'c', 'c.in'], ['d']])
+        self.assertIn('cycle', graph.nodes['c.in']['check'])
+        self.assertEqual(graph.nodes['d']['check'], 'cycle')
+
+    def test_cycle_deep_chain(self):
+        n = 5 * sys.getrecursionlimit()
+        tasks = [Task("t%i" % i, None, task_dep=['t%i' % ((i + 1) % n)])
+                 for i in range(n)]
+        _, report = self._check(dict([(t.name, t) for t in tasks]))
+        self.assertEqual(len(report['cycles']), 1)
+        self.assertEqual(len(report['cycles'][0]), n)
+
+    def test_duplicate_targets(self):
+        graph, report = self._check(_broken_tasks_map())
+        self.assertEqual(report['duplicate_targets'], {'a.out': ['b', 'c']})
+        self.assertIn('duplicate_target', graph.nodes['a.out']['check'])
+
+    def test_orphan_files(self):
+        graph, report = self._check(_broken_tasks_map())
+        self.assertEqual(report['orphan_files'], ['missing.txt'])
+        self.assertEqual(graph.nodes['missing.txt']['check'], 'orphan_file')
+
+    def test_unreachable(self):
+        graph, report = self._check(_broken_tasks_map(), ['b'])
+        # `c` reached through `b.in` file_dep.
+        self.assertEqual(report['unreachable_tasks'], ['a', 'd'])
+        self.assertEqual(graph.nodes['a']['check'], 'unreachable')
+        self.assertEqual(graph.nodes['d']['check'], 'cycle,unreachable')
+        self.assertEqual(graph.nodes['b']['check'], 'cycle')
+
+    def test_wildcard_deps(self):
+        tasks_map = _group_tasks_map()
+        _, report = self._check(tasks_map, ['join'])
+        self.assertEqual(report['unreachable_tasks'], [])
+
+        tasks = [Task("all", None, task_dep=['group:*']),
+                 Task("group:a", None),
+                 Task("group:b", None, task_dep=['all'])]
+        graph, report = self._check(dict([(t.name, t) for t in tasks]),
+                                    ['all'])
+        self.assertEqual(report['unreachable_tasks'], [])
+        self.assertEqual(report['cycles'], [['all', 'group:b']])
+        self.assertEqual(graph.nodes['group:a']['check'], '')
+
+    def test_roots_keep_cycles_and_orphans(self):
+        _, report = self._check(_broken_tasks_map(), ['b'])
+        self.assertEqual(report['cycles'],
+                         [['b', 'b.in', 'c', 'c.in'], ['d']])
+        self.assertEqual(report['orphan_files'], ['missing.txt'])
+
+
 class TestCmdGraphx(unittest.TestCase):
 
     @unittest.skip(('Blocks on graph-plot.'))
@@ -206,3 +309,26 @@ class TestCmdGraphx(unittest.TestCase):
         cmd._execute(graph_type='json', no_children=True)
         got = output.getvalue()
         self.assertNotIn("d2.txt", got)
+
+    def test_check_stdout(self):
+        output = StringIO()
+        cmd = CmdFactory(Graphx, outstream=output, task_list=_broken_tasks())
+        cmd._execute(check=True, pos_args=['b'])
+        report = json.loads(output.getvalue())
+        self.assertEqual(report['unreachable_tasks'], ['a', 'd'])
+        self.assertEqual(report['duplicate_targets'], {'a.out': ['b', 'c']})
+
+
+    def test_check_subtasks_roots(self):
+        output = StringIO()
+        cmd = CmdFactory(Graphx, outstream=output, task_list=_group_tasks())
+        cmd._execute(check=True, subtasks=True, pos_args=['t3'])
+        report = json.loads(output.getvalue())
+        self.assertEqual(report['unreachable_tasks'], ['join'])
+
+    def test_check_ignored_options(self):
+        for kws in ({'deps': 'file'}, {'no_children': True},
+                    {'graph_type': 'gml'}):
+            cmd = CmdFactory(Graphx, outstream=StringIO(),
+                             task_list=_broken_tasks())
+            self.assertRaises(InvalidCommand, cmd._execute, check=True, **kws)